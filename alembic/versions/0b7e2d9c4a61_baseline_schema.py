@@ -0,0 +1,86 @@
+"""baseline schema
+
+Creates ``devices`` and ``ip_logs`` as they existed before migrations were
+tracked. Databases created before this revision already have these tables;
+mark them as up to date with ``alembic stamp 0b7e2d9c4a61`` before running
+``alembic upgrade head``.
+
+Revision ID: 0b7e2d9c4a61
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e2d9c4a61'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'devices',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('hash', sa.String(length=128), nullable=False),
+        sa.Column(
+            'type',
+            sa.Enum('MOBILE', 'TABLET', 'DESKTOP', 'BOT', 'UNKNOWN', name='devicetype', native_enum=False),
+            nullable=False,
+        ),
+        sa.Column('os', sa.String(length=50), nullable=True),
+        sa.Column('os_version', sa.String(length=50), nullable=True),
+        sa.Column('browser', sa.String(length=50), nullable=True),
+        sa.Column('browser_version', sa.String(length=50), nullable=True),
+        sa.Column('device_family', sa.String(length=100), nullable=True),
+        sa.Column('is_touch', sa.Boolean(), nullable=True),
+        sa.Column('user_agent', sa.String(length=512), nullable=True),
+        sa.Column('client_hints', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_devices_hash', 'devices', ['hash'], unique=True)
+
+    op.create_table(
+        'ip_logs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=False),
+        sa.Column('forwarded_for', sa.String(length=512), nullable=True),
+        sa.Column('real_ip', sa.String(length=45), nullable=True),
+        sa.Column('accept', sa.String(length=512), nullable=True),
+        sa.Column('origin', sa.String(length=512), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('ACTIVE', 'INACTIVE', name='iplogstatus', native_enum=False),
+            nullable=False,
+        ),
+        sa.Column('country_short', sa.String(length=10), nullable=True),
+        sa.Column('country_long', sa.String(length=128), nullable=True),
+        sa.Column('region', sa.String(length=128), nullable=True),
+        sa.Column('city', sa.String(length=128), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('timezone', sa.String(length=64), nullable=True),
+        sa.Column('asn', sa.Integer(), nullable=True),
+        sa.Column('asn_org', sa.String(length=256), nullable=True),
+        sa.Column('created_at', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ip_logs')
+    op.drop_index('ix_devices_hash', table_name='devices')
+    op.drop_table('devices')
@@ -0,0 +1,143 @@
+"""binary device fingerprint
+
+Replaces the 64-char hex SHA-256 in ``devices.hash`` with a 16-byte
+BLAKE2b digest stored as ``bytea``. Runs online; every step that needs a
+table lock sets ``lock_timeout`` so it fails fast instead of queueing
+traffic behind it:
+
+1. add a nullable ``hash_bin`` column,
+2. backfill it with keyset pagination over ``id`` (each batch commits on
+   its own) and build the unique index ``CONCURRENTLY``,
+3. add ``CHECK (hash_bin IS NOT NULL) NOT VALID``, catch up rows inserted
+   since the backfill, then ``VALIDATE`` the check without blocking writes,
+4. in one short ``ACCESS EXCLUSIVE`` transaction, ``SET NOT NULL`` (which
+   reuses the validated check instead of scanning), drop the old column and
+   rename ``hash_bin`` to ``hash``.
+
+From step 3 on, new devices can only be inserted by code that writes
+``hash_bin``; deploy the application change together with this revision.
+
+Revision ID: 3f9a1c2b7d4e
+Revises: 0b7e2d9c4a61
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d4e'
+down_revision: Union[str, Sequence[str], None] = '0b7e2d9c4a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+LOCK_TIMEOUT = '5s'
+
+
+def _fingerprint(row) -> bytes:
+    # Frozen copy of DeviceService.generate_identifier at this revision
+    h = hashlib.blake2b(digest_size=16)
+    for value in (
+        row.user_agent,
+        row.os,
+        row.os_version,
+        row.browser,
+        row.browser_version,
+        row.device_family,
+    ):
+        h.update(value.encode("utf-8") if value is not None else b"\x00")
+        h.update(b"\x1f")
+    h.update(b"1" if row.is_touch else b"0")
+    return h.digest()
+
+
+def _backfill(bind) -> None:
+    # Keyset pagination over the primary key; each batch is its own commit
+    select = sa.text(
+        "SELECT id, user_agent, os, os_version, browser, browser_version, "
+        "device_family, is_touch FROM devices "
+        "WHERE id > CAST(:after AS uuid) AND hash_bin IS NULL ORDER BY id LIMIT :limit"
+    )
+    update = sa.text("UPDATE devices SET hash_bin = :fp WHERE id = :id AND hash_bin IS NULL")
+    after = "00000000-0000-0000-0000-000000000000"
+    while True:
+        rows = bind.execute(select, {"after": after, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(update, [{"id": row.id, "fp": _fingerprint(row)} for row in rows])
+        after = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.add_column('devices', sa.Column('hash_bin', sa.LargeBinary(16), nullable=True))
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        _backfill(bind)
+        op.create_index(
+            'ix_devices_hash_bin',
+            'devices',
+            ['hash_bin'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+        op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+        op.execute(
+            "ALTER TABLE devices ADD CONSTRAINT ck_devices_hash_bin_not_null "
+            "CHECK (hash_bin IS NOT NULL) NOT VALID"
+        )
+        op.execute("RESET lock_timeout")
+        # Rows inserted between the backfill and the check
+        _backfill(bind)
+        op.execute("ALTER TABLE devices VALIDATE CONSTRAINT ck_devices_hash_bin_not_null")
+
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute("LOCK TABLE devices IN ACCESS EXCLUSIVE MODE")
+    op.alter_column('devices', 'hash_bin', nullable=False)
+    op.drop_constraint('ck_devices_hash_bin_not_null', 'devices', type_='check')
+    op.drop_index('ix_devices_hash', table_name='devices')
+    op.drop_column('devices', 'hash')
+    op.alter_column('devices', 'hash_bin', new_column_name='hash')
+    op.execute("ALTER INDEX ix_devices_hash_bin RENAME TO ix_devices_hash")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The hex SHA-256 cannot be derived from the BLAKE2b key, so the old
+    # column is rebuilt from the same source fields.
+    op.add_column('devices', sa.Column('hash_hex', sa.String(128), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, user_agent, os, os_version, browser, browser_version, "
+        "device_family, is_touch FROM devices"
+    )).fetchall()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE devices SET hash_hex = :fp WHERE id = :id"),
+            [
+                {
+                    "id": row.id,
+                    "fp": hashlib.sha256((
+                        f"{row.user_agent}|{row.os}|{row.os_version}|"
+                        f"{row.browser}|{row.browser_version}|"
+                        f"{row.device_family}|{row.is_touch}|"
+                    ).encode("utf-8")).hexdigest(),
+                }
+                for row in rows
+            ],
+        )
+
+    op.alter_column('devices', 'hash_hex', nullable=False)
+    op.drop_index('ix_devices_hash', table_name='devices')
+    op.drop_column('devices', 'hash')
+    op.alter_column('devices', 'hash_hex', new_column_name='hash')
+    op.create_index('ix_devices_hash', 'devices', ['hash'], unique=True)
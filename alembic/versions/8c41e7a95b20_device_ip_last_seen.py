@@ -0,0 +1,61 @@
+"""device and ip last seen tracking
+
+Adding the columns is metadata-only; ``last_seen_at`` for existing rows is
+then backfilled from ``updated_at`` in small autocommitted batches so the
+tables are never rewritten in one long transaction.
+
+Revision ID: 8c41e7a95b20
+Revises: 3f9a1c2b7d4e
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e7a95b20'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2b7d4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(bind, table: str) -> None:
+    # Keyset pagination over the primary key; each batch is its own commit
+    select = sa.text(
+        f"SELECT id FROM {table} WHERE id > CAST(:after AS uuid) ORDER BY id LIMIT :limit"
+    )
+    update = sa.text(
+        f"UPDATE {table} SET last_seen_at = updated_at "
+        f"WHERE id >= CAST(:first AS uuid) AND id <= CAST(:last AS uuid) AND last_seen_at IS NULL"
+    )
+    after = "00000000-0000-0000-0000-000000000000"
+    while True:
+        ids = bind.execute(select, {"after": after, "limit": BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        bind.execute(update, {"first": ids[0], "last": ids[-1]})
+        after = ids[-1]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('devices', 'ip_logs'):
+        op.add_column(table, sa.Column('last_seen_at', sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column('hit_count', sa.BigInteger(), nullable=False, server_default='0'))
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for table in ('devices', 'ip_logs'):
+            _backfill(bind, table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('devices', 'ip_logs'):
+        op.drop_column(table, 'hit_count')
+        op.drop_column(table, 'last_seen_at')
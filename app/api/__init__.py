@@ -1,28 +1,107 @@
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import logging
+
 from fastapi import FastAPI, APIRouter, Request, Response, Depends
 import pkgutil
 import importlib
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from starlette.middleware.base import BaseHTTPMiddleware
-from app.database import SessionLocal, get_db
+from app.core import startup
+from app.core.config import settings
+from app.database import SessionLocal, db_breaker, get_db
+from app.service.activity import activity_tracker
 from app.service.device import DeviceService
+from app.service.offload import offload_executor
+
+logger = logging.getLogger(__name__)
+
+
+async def _flush_activity_periodically():
+    while True:
+        await asyncio.sleep(settings.ACTIVITY_FLUSH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(activity_tracker.flush)
+        except Exception:
+            logger.exception("Activity flush failed, will retry")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uvicorn binds the socket only after this returns, so warm-up
+    # completes before the worker can receive any request.
+    if settings.WARM_UP_ON_STARTUP:
+        await startup.warm_up()
+
+    flusher = asyncio.create_task(_flush_activity_periodically())
+    try:
+        yield
+    finally:
+        flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await flusher
+        # Final flush so buffered hits are not lost on shutdown
+        try:
+            await asyncio.to_thread(activity_tracker.flush)
+        except Exception:
+            logger.exception("Final activity flush failed, %d rows dropped", activity_tracker.pending())
+        offload_executor.shutdown()
+
+
+app = FastAPI(root_path="/api", lifespan=lifespan)
+
+# Operational endpoints that must not parse, log or touch the DB
+UNTRACKED_PATH_PREFIXES = ("/metrics", "/health")
+
+
+def _is_untracked(request: Request) -> bool:
+    path = request.scope["path"]
+    root_path = request.scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path.startswith(UNTRACKED_PATH_PREFIXES)
 
-app = FastAPI(root_path="/api")
 
 class DeviceDetectionMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
+        if _is_untracked(request):
+            return await call_next(request)
+
         # Create a DB session manually
         db: Session = SessionLocal()
         try:
             service = DeviceService(db)
-            device_info = service.parse_and_log(request)
-            request.state.device = device_info
+            if db_breaker.allow_request():
+                request.state.device = await self._parse_and_log(service, request)
+            else:
+                # Breaker is open: detect but don't persist
+                request.state.device = await service.parse_device_async(request, offload_executor)
         finally:
-            db.close()  # Always close the session
+            # Closing resets the connection, which is a round trip
+            await asyncio.to_thread(db.close)
 
         response = await call_next(request)
         return response
 
+    @staticmethod
+    async def _parse_and_log(service: DeviceService, request: Request):
+        try:
+            device_info = await service.parse_and_log_async(request, offload_executor)
+        except SQLAlchemyError:
+            db_breaker.record_failure()
+            with suppress(SQLAlchemyError):
+                await asyncio.to_thread(service.db.rollback)
+            return await service.parse_device_async(request, offload_executor)
+
+        # Only the DB steps count, not the geo/UA awaits in between
+        if service.db_time * 1000 > settings.DB_BREAKER_SLOW_MS:
+            db_breaker.record_failure()
+        else:
+            db_breaker.record_success()
+        return device_info
+
 app.add_middleware(DeviceDetectionMiddleware)
 
 
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request, Response
+
+from app.geo import GeoResult, geo
+from app.schema.payload import device_payload_json
+from app.service.offload import offload_executor
+
+
+router = APIRouter()
+
+
+@router.get("/device-info")
+async def device_info(request: Request):
+    ip = request.client.host if request.client else None
+    if ip:
+        geo_result = await offload_executor.run(("geo", ip), geo, ip)
+    else:
+        # No peer address (e.g. some ASGI transports): null geo fields
+        geo_result = GeoResult(ip=None)
+    return Response(
+        content=device_payload_json(geo_result, request.state.device),
+        media_type="application/json",
+    )
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+
+from app.core.startup import state
+
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Warm-up runs in the lifespan, before uvicorn binds its socket, so a
+    worker that answers here has already finished warming up.
+    """
+    return {"ready": True, "warm_up_ms": state.timings}
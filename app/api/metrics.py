@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+
+from app.database import db_breaker, get_pool_status
+from app.service.activity import activity_tracker
+from app.service.offload import offload_executor
+
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get("/db")
+async def db_metrics():
+    return {
+        "pool": get_pool_status(),
+        "breaker": db_breaker.stats(),
+        "activity_pending": activity_tracker.pending(),
+    }
+
+
+@router.get("/offload")
+async def offload_metrics():
+    return offload_executor.stats()
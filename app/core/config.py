@@ -45,6 +45,37 @@ class Settings(BaseSettings):
         f"{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
 
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+
+    # Circuit breaker for device/IP logging
+    DB_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before opening
+    DB_BREAKER_RESET_SECONDS: float = 30.0  # time spent open before a trial request
+    DB_BREAKER_SLOW_MS: float = 250.0  # per-request DB time (pool wait + queries) above this counts as a failure
+
+    # Startup: precompile UA regexes, touch geo indexes and open the pool
+    # before the worker starts accepting requests. Disable to load everything lazily.
+    WARM_UP_ON_STARTUP: bool = True
+
+    # Shared geo lookup server (python -m app.geo.server); unset = in-process lookups
+    GEO_SERVER_SOCKET: str | None = None
+    GEO_SERVER_TIMEOUT_SECONDS: float = 0.5
+    GEO_SERVER_RETRY_SECONDS: float = 5.0  # back-off after the server is unreachable
+    GEO_CACHE_SIZE: int = 100_000
+    GEO_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Off-loop user-agent parsing and geo lookups
+    OFFLOAD_EXECUTOR: str = "thread"  # "thread" or "process"
+    OFFLOAD_MAX_WORKERS: int = 4
+    OFFLOAD_MAX_PENDING: int = 64  # calls handed to the pool at once; the rest wait on the loop
+
+    # Device/IP last-seen tracking
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 10.0
+
     UPLOAD_DIR: Path = Path(__file__).parent.parent.parent / "uploads"
     THUMB_DIR: Path = UPLOAD_DIR / "thumbnails"
     MAX_IMAGE_SIZE_MB: int = 5
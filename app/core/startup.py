@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Representative user agents; parsing them compiles the ua-parser regexes
+WARM_UP_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/143.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.4 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; SM-X710) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/143.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+)
+
+
+class StartupState:
+    def __init__(self):
+        self.timings = {}
+
+
+state = StartupState()
+
+
+def _warm_user_agents() -> None:
+    from user_agents import parse
+
+    for ua_string in WARM_UP_USER_AGENTS:
+        parse(ua_string)
+
+
+def _warm_geo() -> None:
+    from app.geo import warm_up
+
+    warm_up()
+
+
+def _warm_pool() -> None:
+    """Open `pool_size` connections up front so the first requests don't pay for them."""
+    from app.core.config import settings
+    from app.database import engine
+
+    connections = []
+    try:
+        for _ in range(settings.DB_POOL_SIZE):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def _run_step(name: str, step) -> float:
+    """Run one warm-up step, returning its duration in ms. Failures are logged."""
+    start = time.perf_counter()
+    try:
+        step()
+    except Exception:
+        logger.exception("Warm-up step %s failed", name)
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def warm_offload_worker() -> None:
+    """
+    Executor initializer: runs once in every offload thread/process, where
+    user-agent parsing and geo lookups actually happen. Must never raise,
+    a failing initializer breaks the pool.
+    """
+    _run_step("user_agents", _warm_user_agents)
+    _run_step("geo", _warm_geo)
+
+
+async def warm_up() -> dict:
+    """
+    Bring up every offload worker (each warms its own UA regexes and geo
+    readers) and fill the DB pool. A failing step is logged and skipped;
+    the worker pays that cost lazily on first use instead.
+    """
+    from app.service.offload import offload_executor
+
+    timings = {}
+
+    start = time.perf_counter()
+    try:
+        await offload_executor.start()
+    except Exception:
+        logger.exception("Warm-up step offload_workers failed")
+    timings["offload_workers"] = round((time.perf_counter() - start) * 1000, 2)
+
+    timings["db_pool"] = await asyncio.to_thread(_run_step, "db_pool", _warm_pool)
+
+    state.timings = timings
+    logger.info("Warm-up finished: %s", timings)
+    return timings
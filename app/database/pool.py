@@ -0,0 +1,118 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+# Seconds the current request/task has spent blocked on the database:
+# pool checkouts plus statement execution.
+_db_time: ContextVar[float] = ContextVar("db_time", default=0.0)
+
+
+class PoolStats:
+    """
+    Running counters for time spent waiting on a pool checkout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.last_wait = seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "last_wait_ms": self.last_wait * 1000,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_stats.record_wait(waited, timed_out=timed_out)
+            _db_time.set(_db_time.get() + waited)
+
+
+# The start time lives on the per-execution context, so a statement that
+# raises (and never reaches after_cursor_execute) leaves nothing behind.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._db_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_db_start", None)
+    if start is not None:
+        _db_time.set(_db_time.get() + time.perf_counter() - start)
+
+
+def _handle_error(exception_context):
+    # Failed statements still blocked the caller; count them too
+    start = getattr(exception_context.execution_context, "_db_start", None)
+    if start is not None:
+        _db_time.set(_db_time.get() + time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute statement execution time to the calling context."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def reset_db_time() -> None:
+    """Start measuring database time for the current context."""
+    _db_time.set(0.0)
+
+
+def current_db_time() -> float:
+    """Seconds the current context has spent blocked on the database."""
+    return _db_time.get()
+
+
+def pool_status(pool) -> dict:
+    """Live pool gauges merged with the accumulated wait counters."""
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool.overflow() starts at -pool_size
+        "overflow": max(0, pool.overflow()),
+        **pool_stats.snapshot(),
+    }
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 import IP2Location
 import geoip2.database
 from pathlib import Path
@@ -5,6 +7,10 @@ from geoip2.errors import AddressNotFoundError
 from datetime import datetime, timezone as d_timezone, timedelta
 import pytz
 import re
+import sys
+import threading
+
+from app.core.config import settings
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -13,12 +19,26 @@ CITY_DB = BASE_DIR / "GeoLite2-City.mmdb"
 ASN_DB = BASE_DIR / "GeoLite2-ASN.mmdb"
 IP2LOCATION_DB = BASE_DIR / "IP2Location-Lite-DB11.BIN"  # Must be BIN format
 
-# Load IP2Location DB once
-ip2_db = IP2Location.IP2Location(str(IP2LOCATION_DB))
 
-from typing import Optional
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Geo names repeat across lookups; share one copy of each."""
+    return sys.intern(value) if value else value
+
 
 class GeoResult:
+    __slots__ = (
+        "ip",
+        "country_short",
+        "country_long",
+        "region",
+        "city",
+        "latitude",
+        "longitude",
+        "timezone",
+        "asn",
+        "asn_org",
+    )
+
     def __init__(
         self,
         ip: str,
@@ -33,30 +53,19 @@ class GeoResult:
         asn_org: Optional[str] = None,
     ):
         self.ip = ip
-        self.country_short = country_short
-        self.country_long = country_long
-        self.region = region
-        self.city = city
+        self.country_short = _intern(country_short)
+        self.country_long = _intern(country_long)
+        self.region = _intern(region)
+        self.city = _intern(city)
         self.latitude = latitude
         self.longitude = longitude
-        self.timezone = timezone
+        self.timezone = _intern(timezone)
         self.asn = asn
-        self.asn_org = asn_org
+        self.asn_org = _intern(asn_org)
 
     def dict(self) -> dict:
         """Return as dictionary (for API response)"""
-        return {
-            "ip": self.ip,
-            "country_short": self.country_short,
-            "country_long": self.country_long,
-            "region": self.region,
-            "city": self.city,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "timezone": self.timezone,
-            "asn": self.asn,
-            "asn_org": self.asn_org,
-        }
+        return {name: getattr(self, name) for name in self.__slots__}
 
     def __repr__(self):
         return f"<GeoResult {self.ip} {self.country_long}, {self.city}>"
@@ -87,34 +96,105 @@ def parse_timezone(tz_identifier: str) -> str:
 
 
 class GeoIPReader:
+    # IP2Location reads through seek()/read() on one file handle, so each
+    # thread gets its own reader. The GeoLite2 readers are thread-safe and
+    # shared; the lock only guards their lazy creation.
+    _ip2_local = threading.local()
+    _lock = threading.Lock()
     _country_reader = None
     _city_reader = None
     _asn_reader = None
 
+    @classmethod
+    def ip2location(cls):
+        reader = getattr(cls._ip2_local, "reader", None)
+        if reader is None:
+            reader = cls._ip2_local.reader = IP2Location.IP2Location(str(IP2LOCATION_DB))
+        return reader
+
     @classmethod
     def country(cls):
         if cls._country_reader is None:
-            cls._country_reader = geoip2.database.Reader(COUNTRY_DB)
+            with cls._lock:
+                if cls._country_reader is None:
+                    cls._country_reader = geoip2.database.Reader(COUNTRY_DB)
         return cls._country_reader
 
     @classmethod
     def city(cls):
         if cls._city_reader is None:
-            cls._city_reader = geoip2.database.Reader(CITY_DB)
+            with cls._lock:
+                if cls._city_reader is None:
+                    cls._city_reader = geoip2.database.Reader(CITY_DB)
         return cls._city_reader
 
     @classmethod
     def asn(cls):
         if cls._asn_reader is None:
-            cls._asn_reader = geoip2.database.Reader(ASN_DB)
+            with cls._lock:
+                if cls._asn_reader is None:
+                    cls._asn_reader = geoip2.database.Reader(ASN_DB)
         return cls._asn_reader
 
 
+# Spread across the address space so warm-up faults in index pages
+# for both IPv4 and IPv6 trees.
+WARM_UP_IPS = (
+    "1.1.1.1",
+    "8.8.8.8",
+    "81.2.69.142",
+    "103.4.145.1",
+    "185.199.108.153",
+    "223.25.253.142",
+    "2001:4860:4860::8888",
+    "2606:4700:4700::1111",
+)
+
+
+def warm_up() -> None:
+    """
+    Open every reader and run a few lookups before serving traffic.
+    With a geo server configured this only opens the client connection.
+    """
+    geo_many(list(WARM_UP_IPS))
+
+
+def _client():
+    if not settings.GEO_SERVER_SOCKET:
+        return None
+    from app.geo.client import get_client
+
+    return get_client()
+
+
 def geo(ip: str) -> GeoResult:
+    """
+    Resolve an IP, through the shared geo server when GEO_SERVER_SOCKET is
+    configured and reachable, otherwise in-process.
+    """
+    client = _client()
+    if client is not None:
+        results = client.lookup_many([ip])
+        if results is not None:
+            return results[0]
+    return lookup(ip)
+
+
+def geo_many(ips: List[str]) -> List[GeoResult]:
+    """Batched variant of geo(); one round trip to the geo server."""
+    client = _client()
+    if client is not None:
+        results = client.lookup_many(ips)
+        if results is not None:
+            return results
+    return [lookup(ip) for ip in ips]
+
+
+def lookup(ip: str) -> GeoResult:
     """Merge IP2Location and GeoLite2 data and return a GeoResult object with debug prints"""
     # --- IP2Location base data ---
     try:
-        ip2 = ip2_db.get_all(ip)
+        ip2 = GeoIPReader.ip2location().get_all(ip)
         # print(f"[DEBUG] IP2Location data for {ip}: {ip2.__dict__}")
         result = GeoResult(
             ip=ip,
@@ -144,16 +224,16 @@ def geo(ip: str) -> GeoResult:
         # print(f"[DEBUG] GeoLite2 ASN: {asn.autonomous_system_number}, {asn.autonomous_system_organization}")
 
         # Country
-        result.country_short = country.country.iso_code or result.country_short
-        result.country_long = country.country.name or result.country_long
+        result.country_short = _intern(country.country.iso_code) or result.country_short
+        result.country_long = _intern(country.country.name) or result.country_long
 
         # Region
         if city.subdivisions and city.subdivisions.most_specific.name:
-            result.region = city.subdivisions.most_specific.name
+            result.region = _intern(city.subdivisions.most_specific.name)
 
         # City
         if city.city and city.city.name:
-            result.city = city.city.name
+            result.city = _intern(city.city.name)
 
         # Latitude / Longitude
         if city.location and city.location.latitude is not None:
@@ -163,11 +243,11 @@ def geo(ip: str) -> GeoResult:
 
         # Timezone
         if city.location and city.location.time_zone:
-            result.timezone = parse_timezone(city.location.time_zone)
+            result.timezone = _intern(parse_timezone(city.location.time_zone))
 
         # ASN
         result.asn = asn.autonomous_system_number or result.asn
-        result.asn_org = asn.autonomous_system_organization or result.asn_org
+        result.asn_org = _intern(asn.autonomous_system_organization) or result.asn_org
 
         # print(f"[DEBUG] Merged Result: {result.dict()}")
 
@@ -0,0 +1,125 @@
+import logging
+import os
+import socket
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from app.core.config import settings
+from app.geo import GeoResult
+from app.geo.protocol import (
+    HEADER_SIZE,
+    ProtocolError,
+    decode_response,
+    encode_request,
+    frame,
+    frame_length,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GeoClient:
+    """
+    Blocking client for the geo server. Any failure returns None so the
+    caller can fall back to an in-process lookup. Socket or protocol
+    errors also keep the server from being retried until `retry_after`
+    seconds have passed; a request that can't be encoded does not.
+    """
+
+    def __init__(self, socket_path: str, timeout: float, retry_after: float):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._sock_pid = 0
+        self._down_until = 0.0
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._sock_pid = os.getpid()
+        return sock
+
+    def _recv_exactly(self, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = self._sock.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError("Geo server closed the connection")
+            buf.extend(chunk)
+        return bytes(buf)
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def lookup_many(self, ips: Sequence[str]) -> Optional[List[GeoResult]]:
+        if time.monotonic() < self._down_until:
+            return None
+
+        try:
+            request = frame(encode_request(ips))
+        except ProtocolError as e:
+            # Bad input, not a server problem
+            logger.debug("Not sending geo request: %s", e)
+            return None
+
+        with self._lock:
+            try:
+                if self._sock is not None and self._sock_pid != os.getpid():
+                    # Inherited across fork: the stream belongs to the parent
+                    self._close()
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(request)
+                length = frame_length(self._recv_exactly(HEADER_SIZE))
+                return decode_response(self._recv_exactly(length), ips)
+            except (OSError, ProtocolError) as e:
+                logger.warning("Geo server unavailable, using in-process lookups: %s", e)
+                self._close()
+                self._down_until = time.monotonic() + self.retry_after
+                return None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_client: Optional[GeoClient] = None
+_client_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    """
+    A forked child (e.g. an offload process) must not share the parent's
+    connection: replies would be read by whichever process asks first.
+    Its locks may also have been held at fork time, so start from scratch.
+    """
+    global _client, _client_lock
+    if _client is not None and _client._sock is not None:
+        # Closing our copy of the fd leaves the parent's connection intact
+        _client._sock.close()
+    _client = None
+    _client_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client() -> GeoClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeoClient(
+                    settings.GEO_SERVER_SOCKET,
+                    timeout=settings.GEO_SERVER_TIMEOUT_SECONDS,
+                    retry_after=settings.GEO_SERVER_RETRY_SECONDS,
+                )
+    return _client
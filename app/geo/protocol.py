@@ -0,0 +1,156 @@
+"""
+Binary framing for the geo lookup server.
+
+Every frame is a 4-byte big-endian payload length followed by the payload.
+
+Request payload:  count:u16, then per IP  len:u8, ip:ascii
+Response payload: count:u16, then per IP  a result record, in request order
+
+Result record: presence:u16 bitmask over RESULT_FIELDS, followed by the
+present fields in order. Strings are len:u16 + utf-8, floats are f64 and
+the ASN is u32. The IP itself is not echoed; the client already has it.
+"""
+import struct
+from typing import List, Sequence
+
+from app.geo import GeoResult
+
+MAX_BATCH = 0xFFFF
+MAX_FRAME = 16 * 1024 * 1024
+
+RESULT_FIELDS = (
+    ("country_short", "s"),
+    ("country_long", "s"),
+    ("region", "s"),
+    ("city", "s"),
+    ("latitude", "d"),
+    ("longitude", "d"),
+    ("timezone", "s"),
+    ("asn", "I"),
+    ("asn_org", "s"),
+)
+
+_LEN = struct.Struct("!I")
+_U16 = struct.Struct("!H")
+_F64 = struct.Struct("!d")
+_U32 = struct.Struct("!I")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def frame(payload: bytes) -> bytes:
+    return _LEN.pack(len(payload)) + payload
+
+
+def frame_length(header: bytes) -> int:
+    (length,) = _LEN.unpack(header)
+    if length > MAX_FRAME:
+        raise ProtocolError(f"Frame of {length} bytes exceeds limit")
+    return length
+
+
+HEADER_SIZE = _LEN.size
+
+
+def encode_request(ips: Sequence[str]) -> bytes:
+    if len(ips) > MAX_BATCH:
+        raise ProtocolError(f"Batch of {len(ips)} IPs exceeds limit")
+    parts = [_U16.pack(len(ips))]
+    for ip in ips:
+        try:
+            raw = ip.encode("ascii")
+        except UnicodeEncodeError:
+            raise ProtocolError(f"Non-ASCII address {ip!r}") from None
+        if len(raw) > 0xFF:
+            raise ProtocolError(f"Address of {len(raw)} bytes exceeds limit")
+        parts.append(bytes((len(raw),)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def _take(payload: bytes, offset: int, size: int) -> bytes:
+    end = offset + size
+    if end > len(payload):
+        raise ProtocolError("Truncated payload")
+    return payload[offset:end]
+
+
+def _unpack(fmt: struct.Struct, payload: bytes, offset: int):
+    return fmt.unpack(_take(payload, offset, fmt.size))[0]
+
+
+def decode_request(payload: bytes) -> List[str]:
+    count = _unpack(_U16, payload, 0)
+    offset = _U16.size
+    ips = []
+    for _ in range(count):
+        length = _take(payload, offset, 1)[0]
+        offset += 1
+        try:
+            ips.append(_take(payload, offset, length).decode("ascii"))
+        except UnicodeDecodeError:
+            raise ProtocolError("Non-ASCII address in request") from None
+        offset += length
+    if offset != len(payload):
+        raise ProtocolError("Trailing bytes in request")
+    return ips
+
+
+def _encode_result(result: GeoResult, parts: list) -> None:
+    mask = 0
+    body = []
+    for bit, (name, kind) in enumerate(RESULT_FIELDS):
+        value = getattr(result, name)
+        if value is None:
+            continue
+        mask |= 1 << bit
+        if kind == "s":
+            raw = value.encode("utf-8")
+            body.append(_U16.pack(len(raw)))
+            body.append(raw)
+        elif kind == "d":
+            body.append(_F64.pack(value))
+        else:
+            body.append(_U32.pack(value))
+    parts.append(_U16.pack(mask))
+    parts.extend(body)
+
+
+def encode_response(results: Sequence[GeoResult]) -> bytes:
+    parts = [_U16.pack(len(results))]
+    for result in results:
+        _encode_result(result, parts)
+    return b"".join(parts)
+
+
+def decode_response(payload: bytes, ips: Sequence[str]) -> List[GeoResult]:
+    count = _unpack(_U16, payload, 0)
+    if count != len(ips):
+        raise ProtocolError(f"Expected {len(ips)} results, got {count}")
+    offset = _U16.size
+    results = []
+    for ip in ips:
+        mask = _unpack(_U16, payload, offset)
+        offset += _U16.size
+        values: dict = {}
+        for bit, (name, kind) in enumerate(RESULT_FIELDS):
+            if not mask & (1 << bit):
+                continue
+            if kind == "s":
+                length = _unpack(_U16, payload, offset)
+                offset += _U16.size
+                try:
+                    values[name] = _take(payload, offset, length).decode("utf-8")
+                except UnicodeDecodeError:
+                    raise ProtocolError(f"Invalid UTF-8 in {name}") from None
+                offset += length
+            elif kind == "d":
+                values[name] = _unpack(_F64, payload, offset)
+                offset += _F64.size
+            else:
+                values[name] = _unpack(_U32, payload, offset)
+                offset += _U32.size
+        results.append(GeoResult(ip=ip, **values))
+    return results
@@ -0,0 +1,121 @@
+"""
+Local geo lookup daemon.
+
+Owns the IP2Location/GeoLite2 readers and one shared result cache for the
+whole host, and answers batched lookups over a Unix domain socket:
+
+    python -m app.geo.server [socket_path]
+
+Workers use it through app.geo.client when GEO_SERVER_SOCKET is set.
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.core.config import settings
+from app.geo import WARM_UP_IPS, GeoResult, lookup
+from app.geo.protocol import (
+    HEADER_SIZE,
+    ProtocolError,
+    decode_request,
+    encode_response,
+    frame,
+    frame_length,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GeoCache:
+    """
+    LRU cache of lookup results with a TTL; the TTL keeps the formatted
+    timezone offset from going stale across DST changes.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, GeoResult]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ip: str) -> Optional[GeoResult]:
+        entry = self._entries.get(ip)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(ip)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, ip: str, result: GeoResult) -> None:
+        self._entries[ip] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(ip)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class GeoServer:
+    def __init__(self, socket_path: str, cache: GeoCache):
+        self.socket_path = socket_path
+        self.cache = cache
+
+    def resolve(self, ips: List[str]) -> List[GeoResult]:
+        results = []
+        for ip in ips:
+            result = self.cache.get(ip)
+            if result is None:
+                try:
+                    result = lookup(ip)
+                except Exception as e:
+                    logger.warning("Geo lookup failed for %s: %s", ip, e)
+                    result = GeoResult(ip=ip)
+                else:
+                    self.cache.put(ip, result)
+            results.append(result)
+        return results
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readexactly(HEADER_SIZE)
+                payload = await reader.readexactly(frame_length(header))
+                results = self.resolve(decode_request(payload))
+                writer.write(frame(encode_response(results)))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass  # client closed the connection
+        except ProtocolError as e:
+            logger.warning("Dropping geo client after bad frame: %s", e)
+        except ConnectionError:
+            pass  # client went away mid-response
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        logger.info("Geo server listening on %s", self.socket_path)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: List[str]) -> None:
+    logging.basicConfig(level=logging.INFO)
+    socket_path = argv[1] if len(argv) > 1 else settings.GEO_SERVER_SOCKET
+    if not socket_path:
+        raise SystemExit("No socket path given and GEO_SERVER_SOCKET is not set")
+
+    for ip in WARM_UP_IPS:
+        lookup(ip)
+    cache = GeoCache(settings.GEO_CACHE_SIZE, settings.GEO_CACHE_TTL_SECONDS)
+    asyncio.run(GeoServer(socket_path, cache).serve())
+
+
+if __name__ == "__main__":
+    main(sys.argv)
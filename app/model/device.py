@@ -1,5 +1,5 @@
 # app/models/device.py
-from sqlalchemy import Column, String, Boolean, Enum, Integer, BigInteger, ForeignKey, Float
+from sqlalchemy import Column, String, Boolean, Enum, Integer, BigInteger, ForeignKey, Float, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -15,7 +15,8 @@ class Device(Base):
     __tablename__ = "devices"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    hash = Column(String(128), nullable=False, unique=True, index=True)
+    # 16-byte BLAKE2b fingerprint, see DeviceService.generate_identifier
+    hash = Column(LargeBinary(16), nullable=False, unique=True, index=True)
 
     type = Column(DeviceTypeEnum, nullable=False)
     os = Column(String(50), nullable=True)
@@ -31,6 +32,10 @@ class Device(Base):
     created_at = Column(BigInteger, nullable=False, default=current_millis)
     updated_at = Column(BigInteger, nullable=False, default=current_millis, onupdate=current_millis)
 
+    # Coalesced activity, written in batches by ActivityTracker
+    last_seen_at = Column(BigInteger, nullable=True, default=current_millis)
+    hit_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+
     # Relationship
     ip_logs = relationship(
         "IPLog",
@@ -84,4 +89,8 @@ class IPLog(Base):
     created_at = Column(BigInteger, nullable=False, default=current_millis)
     updated_at = Column(BigInteger, nullable=False, default=current_millis, onupdate=current_millis)
 
+    # Coalesced activity, written in batches by ActivityTracker
+    last_seen_at = Column(BigInteger, nullable=True, default=current_millis)
+    hit_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+
     device = relationship("Device", back_populates="ip_logs")
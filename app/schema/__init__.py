@@ -1,17 +1,18 @@
+from dataclasses import dataclass
 from typing import Optional, Dict
 
-from pydantic import BaseModel
-
 from app.model.enum import DeviceType
 
 
-class DeviceInfo(BaseModel):
+@dataclass(slots=True)
+class DeviceInfo:
+    """Parsed device details; built once per request, so kept lightweight."""
     type: DeviceType
     os: str
-    os_version: str | None = None
     browser: str
+    user_agent: Optional[str]
+    client_hints: Optional[Dict]
+    os_version: str | None = None
     browser_version: str | None = None
     device_family: str | None = None
     is_touch: bool = False
-    user_agent: Optional[str]
-    client_hints: Optional[Dict]
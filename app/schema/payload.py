@@ -0,0 +1,49 @@
+from json.encoder import encode_basestring_ascii
+from typing import Optional
+
+from app.geo import GeoResult
+from app.schema import DeviceInfo
+
+
+def _str(value: Optional[str]) -> str:
+    return "null" if value is None else encode_basestring_ascii(value)
+
+
+def _num(value) -> str:
+    return "null" if value is None else repr(value)
+
+
+def _hints(hints: Optional[dict]) -> str:
+    if hints is None:
+        return "null"
+    return "{" + ",".join(f"{encode_basestring_ascii(k)}:{_str(v)}" for k, v in hints.items()) + "}"
+
+
+def device_payload_json(geo_result: GeoResult, device: DeviceInfo) -> bytes:
+    """
+    Serialize the geo + device response straight to JSON bytes,
+    without building intermediate dicts.
+    """
+    return (
+        f'{{"ip":{_str(geo_result.ip)},'
+        f'"country_short":{_str(geo_result.country_short)},'
+        f'"country_long":{_str(geo_result.country_long)},'
+        f'"region":{_str(geo_result.region)},'
+        f'"city":{_str(geo_result.city)},'
+        f'"latitude":{_num(geo_result.latitude)},'
+        f'"longitude":{_num(geo_result.longitude)},'
+        f'"timezone":{_str(geo_result.timezone)},'
+        f'"asn":{_num(geo_result.asn)},'
+        f'"asn_org":{_str(geo_result.asn_org)},'
+        f'"device":{{'
+        f'"type":{_str(device.type.value)},'
+        f'"os":{_str(device.os)},'
+        f'"os_version":{_str(device.os_version)},'
+        f'"browser":{_str(device.browser)},'
+        f'"browser_version":{_str(device.browser_version)},'
+        f'"device_family":{_str(device.device_family)},'
+        f'"is_touch":{"true" if device.is_touch else "false"},'
+        f'"user_agent":{_str(device.user_agent)},'
+        f'"client_hints":{_hints(device.client_hints)}'
+        f'}}}}'
+    ).encode("ascii")
@@ -0,0 +1,120 @@
+import threading
+import uuid
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.utils import current_millis
+
+# Rows per UPDATE ... FROM (VALUES ...) statement
+FLUSH_CHUNK_SIZE = 1000
+
+
+class ActivityTracker:
+    """
+    Coalesces last-seen/hit-count updates for devices and IP logs.
+
+    Hits are buffered per row id and written by `flush()` as one batched
+    UPDATE per table, so write load follows the number of distinct active
+    devices rather than the request rate.
+    """
+
+    TABLES = ("devices", "ip_logs")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # table -> row id -> [last_seen_at, hits]
+        self._pending: Dict[str, Dict[uuid.UUID, List[int]]] = {t: {} for t in self.TABLES}
+
+    def _touch(self, table: str, row_id: uuid.UUID, seen_at: int | None = None, hits: int = 1) -> None:
+        seen_at = seen_at or current_millis()
+        with self._lock:
+            entry = self._pending[table].get(row_id)
+            if entry is None:
+                self._pending[table][row_id] = [seen_at, hits]
+            else:
+                if seen_at > entry[0]:
+                    entry[0] = seen_at
+                entry[1] += hits
+
+    def touch_device(self, device_id: uuid.UUID) -> None:
+        self._touch("devices", device_id)
+
+    def touch_ip(self, ip_log_id: uuid.UUID) -> None:
+        self._touch("ip_logs", ip_log_id)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(rows) for rows in self._pending.values())
+
+    def _drain(self) -> Dict[str, Dict[uuid.UUID, List[int]]]:
+        with self._lock:
+            drained = self._pending
+            self._pending = {t: {} for t in self.TABLES}
+        return drained
+
+    def _restore(self, drained: Dict[str, Dict[uuid.UUID, List[int]]]) -> None:
+        for table, rows in drained.items():
+            for row_id, (seen_at, hits) in rows.items():
+                self._touch(table, row_id, seen_at, hits)
+
+    @staticmethod
+    def _update_statement(table: str, rows: List[Tuple[uuid.UUID, List[int]]]):
+        values = []
+        params = {}
+        for i, (row_id, (seen_at, hits)) in enumerate(rows):
+            values.append(f"(CAST(:id{i} AS uuid), CAST(:ts{i} AS bigint), CAST(:h{i} AS bigint))")
+            params[f"id{i}"] = row_id
+            params[f"ts{i}"] = seen_at
+            params[f"h{i}"] = hits
+
+        stmt = text(
+            f"UPDATE {table} AS t "
+            f"SET last_seen_at = GREATEST(t.last_seen_at, v.last_seen_at), "
+            f"hit_count = t.hit_count + v.hits "
+            f"FROM (VALUES {', '.join(values)}) AS v(id, last_seen_at, hits) "
+            f"WHERE t.id = v.id"
+        )
+        return stmt, params
+
+    def flush(self) -> int:
+        """
+        Write all buffered activity to the database.
+        Returns the number of rows updated.
+
+        Rows are written in id order and each chunk commits on its own, so
+        workers flushing overlapping rows take their locks in the same order
+        and hold them only briefly. Chunks that fail, and those after them,
+        are put back to be retried on the next flush.
+        """
+        drained = self._drain()
+        chunks = []
+        for table in self.TABLES:
+            items = sorted(drained[table].items())
+            for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                chunks.append((table, items[start:start + FLUSH_CHUNK_SIZE]))
+        if not chunks:
+            return 0
+
+        flushed = 0
+        db = SessionLocal()
+        try:
+            for i, (table, rows) in enumerate(chunks):
+                stmt, params = self._update_statement(table, rows)
+                try:
+                    db.execute(stmt, params)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    for failed_table, failed_rows in chunks[i:]:
+                        self._restore({failed_table: dict(failed_rows)})
+                    raise
+                flushed += len(rows)
+        finally:
+            db.close()
+
+        return flushed
+
+
+activity_tracker = ActivityTracker()
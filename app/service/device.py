@@ -1,5 +1,7 @@
 # app/services/device_service.py
+import asyncio
 import hashlib
+import uuid
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
@@ -7,13 +9,25 @@ from starlette.requests import Request
 from user_agents import parse
 from typing import Optional, Dict
 
-from app.geo import GeoIPReader, geo
+from app.database.pool import current_db_time, reset_db_time
+from app.geo import GeoIPReader, GeoResult, geo
 from app.model import Device, IPLog
 from app.model.enum import DeviceType, IPLogStatus
 from app.schema import DeviceInfo
+from app.service.activity import activity_tracker
 from app.utils import current_millis
+from app.utils.coalescing_executor import CoalescingExecutor
 from geoip2.errors import AddressNotFoundError
 
+FINGERPRINT_SIZE = 16
+
+
+def parse_user_agent(ua_string: str):
+    """Parse a user-agent string, returning None if it can't be parsed."""
+    try:
+        return parse(ua_string)
+    except Exception:
+        return None
 
 
 class DeviceService:
@@ -24,34 +38,48 @@ class DeviceService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.db_time = 0.0  # seconds spent in DB steps of parse_and_log_async
 
-    def generate_identifier(self, device_info: DeviceInfo) -> str:
+    def generate_identifier(self, device_info: DeviceInfo) -> bytes:
         """
         Generate a unique identifier for a device to prevent duplicates.
-        Combines user-agent, OS, browser, device family, IP.
-        """
-        raw_string = (
-            f"{device_info.user_agent}|"
-            f"{device_info.os}|"
-            f"{device_info.os_version}|"
-            f"{device_info.browser}|"
-            f"{device_info.browser_version}|"
-            f"{device_info.device_family}|"
-            f"{device_info.is_touch}|"
-        )
-        return hashlib.sha256(raw_string.encode("utf-8")).hexdigest()
+        Combines user-agent, OS, browser and device family into a 16-byte
+        BLAKE2b digest, feeding each field straight into the hasher.
+        """
+        h = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+        for value in (
+            device_info.user_agent,
+            device_info.os,
+            device_info.os_version,
+            device_info.browser,
+            device_info.browser_version,
+            device_info.device_family,
+        ):
+            # NUL marks a missing value so None and "" hash differently
+            h.update(value.encode("utf-8") if value is not None else b"\x00")
+            h.update(b"\x1f")
+        h.update(b"1" if device_info.is_touch else b"0")
+        return h.digest()
 
     def parse_device(self, request: Request) -> DeviceInfo:
         """
         Parse the request headers to build a DeviceInfo object.
         """
         ua_string = request.headers.get("user-agent", "")
+        return self.build_device_info(request, ua_string, parse_user_agent(ua_string))
 
-        try:
-            ua = parse(ua_string)
-        except Exception:
-            ua = None
+    async def parse_device_async(self, request: Request, executor: CoalescingExecutor) -> DeviceInfo:
+        """
+        Same as parse_device, with the user-agent parsing run on `executor`.
+        """
+        ua_string = request.headers.get("user-agent", "")
+        ua = await executor.run(("ua", ua_string), parse_user_agent, ua_string)
+        return self.build_device_info(request, ua_string, ua)
 
+    def build_device_info(self, request: Request, ua_string: str, ua) -> DeviceInfo:
+        """
+        Build a DeviceInfo from an already parsed user agent plus client hints.
+        """
         # Determine device type
         if ua and ua.is_bot:
             device_type = DeviceType.BOT
@@ -159,43 +187,124 @@ class DeviceService:
         """
         device_info = self.parse_device(request)
         device = self.log_device(device_info)
-        self.log_ip_for_device(device,request)
+        device_id = device.id
+        ip_log = self.log_ip_for_device(device,request)
+        self.track_activity(device_id, ip_log.id if ip_log else None)
+        return device_info
+
+    async def parse_and_log_async(self, request: Request, executor: CoalescingExecutor) -> DeviceInfo:
+        """
+        Same workflow as parse_and_log, but nothing blocks the event loop:
+        user-agent parsing and geo lookups run on `executor`, database steps
+        on a worker thread. Geo is only resolved when the device's active IP
+        changes. Time spent on the database is accumulated in `db_time`.
+        """
+        device_info = await self.parse_device_async(request, executor)
+        ip_address = request.client.host if request.client else None
+
+        device_id, ip_log_id = await self._run_db(self._log_device_and_active_ip, device_info, ip_address)
+        if ip_address and ip_log_id is None:
+            geo_data = await executor.run(("geo", ip_address), geo, ip_address)
+            ip_log_id = await self._run_db(self._replace_active_ip_id, device_id, request, ip_address, geo_data)
+
+        self.track_activity(device_id, ip_log_id)
         return device_info
 
+    async def _run_db(self, fn, *args):
+        """
+        Run a synchronous DB step on a worker thread. The thread runs in a
+        copy of the caller's context, so its DB time is handed back here.
+        """
+        def call():
+            reset_db_time()
+            try:
+                return fn(*args)
+            finally:
+                self.db_time += current_db_time()
+
+        return await asyncio.to_thread(call)
+
+    def _log_device_and_active_ip(self, device_info: DeviceInfo, ip_address: str | None):
+        """
+        Returns (device_id, active ip log id). The ip log id is None when
+        `ip_address` is not the device's active IP yet; in that case the
+        transaction is ended so no connection is held while geo runs.
+        """
+        device_id = self.log_device(device_info).id
+        if not ip_address:
+            return device_id, None
+
+        active_ip = self.find_active_ip(device_id)
+        if active_ip and active_ip.ip_address == ip_address:
+            return device_id, active_ip.id
+
+        self.db.commit()
+        return device_id, None
+
+    def _replace_active_ip_id(self, device_id: uuid.UUID, request: Request, ip_address: str, geo_data: GeoResult) -> uuid.UUID:
+        return self.replace_active_ip(device_id, request, ip_address, geo_data).id
+
+    def track_activity(self, device_id: uuid.UUID, ip_log_id: uuid.UUID | None) -> None:
+        # Buffered; written by the periodic activity flush
+        activity_tracker.touch_device(device_id)
+        if ip_log_id:
+            activity_tracker.touch_ip(ip_log_id)
+
+    def find_active_ip(self, device_id: uuid.UUID) -> IPLog | None:
+        # Newest first, so stray duplicate ACTIVE rows can't break lookups
+        return (
+            self.db.query(IPLog)
+            .filter(
+                IPLog.device_id == device_id,
+                IPLog.status == IPLogStatus.ACTIVE
+            )
+            .order_by(IPLog.created_at.desc())
+            .first()
+        )
+
     def log_ip_for_device(self, device: Device, request: Request) -> IPLog:
         """
         Auto-deactivate old IPs when a new one appears.
         If the active IP is unchanged, do nothing.
         Also stores geolocation info from IP2Location + GeoLite2.
         """
-
         ip_address = request.client.host if request.client else None
+        if not ip_address:
+            return None
+
+        # --- Check for existing active IP ---
+        active_ip: IPLog | None = self.find_active_ip(device.id)
+
+        if active_ip and active_ip.ip_address == ip_address:
+            return active_ip
+
+        return self.replace_active_ip(device.id, request, ip_address, geo(ip_address))
+
+    def replace_active_ip(self, device_id: uuid.UUID, request: Request, ip_address: str, geo_data: GeoResult) -> IPLog:
+        """
+        Deactivate the device's active IPs and insert `ip_address` as the new one.
+        Holds a lock on the device row, so concurrent requests arriving on the
+        same new IP end up with a single ACTIVE row.
+        """
         forwarded_for = request.headers.get("x-forwarded-for")
         real_ip = request.headers.get("x-real-ip")
         accept = request.headers.get("accept")
         origin = request.headers.get("origin")
 
-        if not ip_address:
-            return None
-
-        # --- Check for existing active IP ---
-        active_ip: IPLog | None = (
-            self.db.query(IPLog)
-            .filter(
-                IPLog.device_id == device.id,
-                IPLog.status == IPLogStatus.ACTIVE
-            )
-            .one_or_none()
-        )
+        # --- Serialize per device, then re-check under the lock ---
+        self.db.query(Device.id).filter(Device.id == device_id).with_for_update().one()
 
+        active_ip: IPLog | None = self.find_active_ip(device_id)
         if active_ip and active_ip.ip_address == ip_address:
+            # Another request got here first
+            self.db.commit()
             return active_ip
 
         # --- Deactivate old active IPs ---
         (
             self.db.query(IPLog)
             .filter(
-                IPLog.device_id == device.id,
+                IPLog.device_id == device_id,
                 IPLog.status == IPLogStatus.ACTIVE
             )
             .update(
@@ -207,12 +316,9 @@ class DeviceService:
             )
         )
 
-        # --- Get geolocation data ---
-        geo_data = geo(ip_address)
-
         # --- Create new IPLog with geo fields ---
         new_ip = IPLog(
-            device_id=device.id,
+            device_id=device_id,
             ip_address=ip_address,
             forwarded_for=forwarded_for,
             real_ip=real_ip,
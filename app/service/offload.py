@@ -0,0 +1,11 @@
+from app.core.config import settings
+from app.core.startup import warm_offload_worker
+from app.utils.coalescing_executor import CoalescingExecutor
+
+# Shared pool for user-agent parsing and geo lookups
+offload_executor = CoalescingExecutor(
+    kind=settings.OFFLOAD_EXECUTOR,
+    max_workers=settings.OFFLOAD_MAX_WORKERS,
+    max_pending=settings.OFFLOAD_MAX_PENDING,
+    initializer=warm_offload_worker if settings.WARM_UP_ON_STARTUP else None,
+)
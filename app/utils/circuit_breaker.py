@@ -0,0 +1,86 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Minimal consecutive-failure circuit breaker.
+
+    closed    -> calls are allowed, failures are counted.
+    open      -> calls are rejected until `reset_timeout` has elapsed.
+    half_open -> a single trial call is allowed; success closes the
+                 breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                now = time.monotonic()
+                # A trial that never reported back must not wedge the breaker
+                if not self._trial_in_flight or now - self._trial_started_at >= self.reset_timeout:
+                    self._trial_in_flight = True
+                    self._trial_started_at = now
+                    return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                self._failures = 0
+            elif state == self.HALF_OPEN:
+                # The trial call went through
+                self._state = self.CLOSED
+                self._failures = 0
+                self._trial_in_flight = False
+            # OPEN: a call admitted before the trip finished late; ignore it
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "times_opened": self._times_opened,
+            }
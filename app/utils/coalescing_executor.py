@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+
+def _noop() -> None:
+    pass
+
+
+class CoalescingExecutor:
+    """
+    Runs blocking calls on a bounded thread or process pool.
+
+    Concurrent calls with the same key share one in-flight future, and at
+    most `max_pending` calls are handed to the pool at a time; the rest
+    wait on the event loop without blocking it.
+
+    `initializer` runs once in every worker thread/process as it starts;
+    `start()` brings all workers up front so none is created mid-traffic.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_pending: int = 64,
+        initializer: Callable | None = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.initializer = initializer
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.queued = 0
+        self.in_pool = 0
+        self.submitted = 0
+        self.coalesced = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=self.initializer,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="offload",
+                    initializer=self.initializer,
+                )
+        return self._executor
+
+    async def start(self) -> None:
+        """Create the pool and every worker in it, running `initializer` in each."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        if self.kind == "thread":
+            # Every call holds its thread until all have arrived, so the pool
+            # has to spawn max_workers distinct threads.
+            barrier = threading.Barrier(self.max_workers)
+            calls = [loop.run_in_executor(executor, barrier.wait, 30) for _ in range(self.max_workers)]
+        else:
+            # Submitted back to back, before any worker can go idle, so each
+            # submit launches a new process.
+            calls = [loop.run_in_executor(executor, _noop) for _ in range(self.max_workers)]
+        await asyncio.gather(*calls)
+
+    async def _submit(self, fn: Callable, args: tuple) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_pool += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_pool -= 1
+            self._slots.release()
+
+    async def run(self, key: Hashable, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` off the loop, sharing the result with callers using the same key."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.submitted += 1
+        future = asyncio.ensure_future(self._submit(fn, args))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        # Calls handed to the pool beyond max_workers sit in its own queue
+        running = min(self.in_pool, self.max_workers)
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queued": self.queued + self.in_pool - running,
+            "running": running,
+            "inflight_keys": len(self._inflight),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,67 @@
+"""
+Startup benchmark: import time of `app` and latency of the first requests,
+with and without the lifespan warm-up.
+
+Requires the configured PostgreSQL database (with migrations applied) and
+the geo databases in app/geo; without them only the error path is measured.
+
+    python -m bench.startup
+"""
+import json
+import os
+import subprocess
+import sys
+
+REQUESTS = 5
+
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app
+import_ms = (time.perf_counter() - t0) * 1000
+
+from fastapi.testclient import TestClient
+
+headers = {"user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                         "(KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36"}
+t0 = time.perf_counter()
+# TestClient's default client host is "testclient", which geo() can't resolve
+with TestClient(app.application, client=("203.0.113.1", 50000)) as client:
+    startup_ms = (time.perf_counter() - t0) * 1000
+    latencies = []
+    for _ in range(%d):
+        t = time.perf_counter()
+        client.get("/", headers=headers)
+        latencies.append(round((time.perf_counter() - t) * 1000, 2))
+print(json.dumps({"import_ms": round(import_ms, 2),
+                  "startup_ms": round(startup_ms, 2),
+                  "request_ms": latencies}))
+""" % REQUESTS
+
+
+def run(warm_up: bool) -> dict:
+    env = dict(os.environ, WARM_UP_ON_STARTUP="true" if warm_up else "false")
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    for warm_up in (False, True):
+        result = run(warm_up)
+        label = "warm-up" if warm_up else "lazy"
+        print(
+            f"{label:8} import={result['import_ms']:8.2f}ms "
+            f"startup={result['startup_ms']:8.2f}ms "
+            f"first={result['request_ms'][0]:8.2f}ms "
+            f"rest={result['request_ms'][1:]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import uuid
+
+import pytest
+
+from app.service import activity
+from app.service.activity import ActivityTracker
+
+
+class FakeSession:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def execute(self, stmt, params):
+        if self.fail_on is not None and len(self.executed) == self.fail_on:
+            self.executed.append((str(stmt), params))
+            raise RuntimeError("db down")
+        self.executed.append((str(stmt), params))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def session(monkeypatch):
+    holder = {"session": FakeSession()}
+    monkeypatch.setattr(activity, "SessionLocal", lambda: holder["session"])
+    return holder
+
+
+def ids(n):
+    return [uuid.UUID(int=i + 1) for i in range(n)]
+
+
+def test_touch_merges_hits_and_keeps_latest_seen():
+    tracker = ActivityTracker()
+    device_id = uuid.uuid4()
+    tracker._touch("devices", device_id, seen_at=200)
+    tracker._touch("devices", device_id, seen_at=100)
+    tracker._touch("devices", device_id, seen_at=300, hits=3)
+
+    assert tracker._pending["devices"][device_id] == [300, 5]
+    assert tracker.pending() == 1
+
+
+def test_update_statement_text_and_params():
+    device_id = uuid.uuid4()
+    stmt, params = ActivityTracker._update_statement("devices", [(device_id, [123, 4])])
+
+    sql = str(stmt)
+    assert sql.startswith("UPDATE devices AS t ")
+    assert "GREATEST(t.last_seen_at, v.last_seen_at)" in sql
+    assert "hit_count = t.hit_count + v.hits" in sql
+    assert "FROM (VALUES (CAST(:id0 AS uuid), CAST(:ts0 AS bigint), CAST(:h0 AS bigint)))" in sql
+    assert params == {"id0": device_id, "ts0": 123, "h0": 4}
+
+
+def test_flush_writes_each_table_in_id_order(session):
+    tracker = ActivityTracker()
+    device_ids = ids(3)
+    for device_id in reversed(device_ids):
+        tracker.touch_device(device_id)
+    tracker.touch_ip(uuid.uuid4())
+
+    assert tracker.flush() == 4
+    db = session["session"]
+    assert [sql.split(" ")[1] for sql, _ in db.executed] == ["devices", "ip_logs"]
+    assert [db.executed[0][1][f"id{i}"] for i in range(3)] == device_ids
+    assert db.commits == 2
+    assert db.closed
+    assert tracker.pending() == 0
+
+
+def test_flush_commits_per_chunk(session, monkeypatch):
+    monkeypatch.setattr(activity, "FLUSH_CHUNK_SIZE", 2)
+    tracker = ActivityTracker()
+    for device_id in ids(5):
+        tracker.touch_device(device_id)
+
+    assert tracker.flush() == 5
+    db = session["session"]
+    assert [len(params) // 3 for _, params in db.executed] == [2, 2, 1]
+    assert db.commits == 3
+
+
+def test_failed_flush_restores_only_uncommitted_chunks(session, monkeypatch):
+    monkeypatch.setattr(activity, "FLUSH_CHUNK_SIZE", 2)
+    session["session"] = FakeSession(fail_on=1)
+    tracker = ActivityTracker()
+    device_ids = ids(5)
+    for device_id in device_ids:
+        tracker._touch("devices", device_id, seen_at=100)
+
+    with pytest.raises(RuntimeError):
+        tracker.flush()
+
+    # First chunk committed; the failing chunk and the one after it are kept
+    assert set(tracker._pending["devices"]) == set(device_ids[2:])
+    assert session["session"].rollbacks == 1
+
+
+def test_restored_hits_merge_with_new_ones(session):
+    session["session"] = FakeSession(fail_on=0)
+    tracker = ActivityTracker()
+    device_id = uuid.uuid4()
+    tracker._touch("devices", device_id, seen_at=100, hits=2)
+
+    with pytest.raises(RuntimeError):
+        tracker.flush()
+    tracker._touch("devices", device_id, seen_at=50)
+
+    assert tracker._pending["devices"][device_id] == [100, 3]
+
+
+def test_flush_without_activity_skips_the_database(session):
+    session["session"] = None
+    assert ActivityTracker().flush() == 0
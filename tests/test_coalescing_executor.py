@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.coalescing_executor import CoalescingExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = CoalescingExecutor(kind="thread", max_workers=2, max_pending=4)
+    yield executor
+    executor.shutdown()
+
+
+def test_same_key_calls_share_one_future(executor):
+    calls = []
+    release = threading.Event()
+
+    def work(value):
+        calls.append(value)
+        release.wait(timeout=5)
+        return value * 2
+
+    async def main():
+        tasks = [asyncio.create_task(executor.run(("ip", "1.1.1.1"), work, 21)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["inflight_keys"] == 1
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == [42] * 5
+    assert calls == [21]
+    stats = executor.stats()
+    assert stats["submitted"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["inflight_keys"] == 0
+
+
+def test_distinct_keys_run_separately(executor):
+    async def main():
+        return await asyncio.gather(*(executor.run(("ua", i), str, i) for i in range(3)))
+
+    assert asyncio.run(main()) == ["0", "1", "2"]
+    assert executor.stats()["submitted"] == 3
+
+
+def test_key_is_released_after_completion(executor):
+    calls = []
+
+    def work():
+        calls.append(1)
+
+    async def main():
+        await executor.run("key", work)
+        await executor.run("key", work)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_exception_reaches_every_waiter(executor):
+    def fail():
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(executor.run("key", fail) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_queue_depth_counts_calls_waiting_for_a_worker(executor):
+    release = threading.Event()
+
+    async def main():
+        tasks = [asyncio.create_task(executor.run(i, release.wait, 5)) for i in range(6)]
+        await asyncio.sleep(0.05)
+        stats = executor.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(main())
+    # 2 workers busy; 2 more handed to the pool, 2 held back by max_pending
+    assert stats["running"] == 2
+    assert stats["queued"] == 4
+
+
+def test_start_initializes_every_worker_thread():
+    initialized = []
+
+    def initializer():
+        initialized.append(threading.get_ident())
+
+    executor = CoalescingExecutor(kind="thread", max_workers=3, initializer=initializer)
+    try:
+        asyncio.run(executor.start())
+    finally:
+        executor.shutdown()
+
+    assert len(set(initialized)) == 3
@@ -0,0 +1,72 @@
+import os
+
+from app.geo import GeoResult
+from app.geo import client as geo_client
+from app.geo.client import GeoClient
+from app.geo.protocol import encode_response, frame
+
+
+class FakeSocket:
+    def __init__(self, reply: bytes = b""):
+        self.reply = reply
+        self.sent = []
+        self.closed = False
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+    def recv(self, size):
+        chunk, self.reply = self.reply[:size], self.reply[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+def make_client(monkeypatch, sockets):
+    client = GeoClient("/tmp/unused.sock", timeout=1, retry_after=5)
+
+    def connect():
+        client._sock_pid = os.getpid()
+        return sockets.pop(0)
+
+    monkeypatch.setattr(client, "_connect", connect)
+    return client
+
+
+def reply_for(*ips):
+    return frame(encode_response([GeoResult(ip=ip, country_short="BD") for ip in ips]))
+
+
+def test_socket_inherited_across_fork_is_replaced(monkeypatch):
+    fresh = FakeSocket(reply_for("1.1.1.1"))
+    client = make_client(monkeypatch, [fresh])
+    inherited = FakeSocket()
+    client._sock = inherited
+    client._sock_pid = os.getpid() + 1  # connected by another process
+
+    results = client.lookup_many(["1.1.1.1"])
+
+    assert results[0].country_short == "BD"
+    assert inherited.closed and not inherited.sent
+    assert fresh.sent
+
+
+def test_bad_input_does_not_mark_server_down(monkeypatch):
+    client = make_client(monkeypatch, [FakeSocket(reply_for("8.8.8.8"))])
+
+    assert client.lookup_many(["ünïcode"]) is None
+    assert client._down_until == 0.0
+    assert client.lookup_many(["8.8.8.8"])[0].ip == "8.8.8.8"
+
+
+def test_reset_after_fork_drops_shared_client():
+    sock = FakeSocket()
+    client = GeoClient("/tmp/unused.sock", timeout=1, retry_after=5)
+    client._sock = sock
+    geo_client._client = client
+
+    geo_client._reset_after_fork()
+
+    assert geo_client._client is None
+    assert sock.closed
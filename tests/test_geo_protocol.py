@@ -0,0 +1,73 @@
+import pytest
+
+from app.geo import GeoResult
+from app.geo.protocol import (
+    HEADER_SIZE,
+    ProtocolError,
+    decode_request,
+    decode_response,
+    encode_request,
+    encode_response,
+    frame,
+    frame_length,
+)
+
+
+def test_request_round_trip():
+    ips = ["1.1.1.1", "2001:4860:4860::8888", "223.25.253.142"]
+    assert decode_request(encode_request(ips)) == ips
+
+
+def test_response_round_trip():
+    results = [
+        GeoResult(
+            ip="223.25.253.142",
+            country_short="BD",
+            country_long="Bangladesh",
+            region="Rangpur",
+            city="Rangpur",
+            latitude=23.7018,
+            longitude=90.3742,
+            timezone="Asia/Dhaka (+06:00)",
+            asn=134968,
+            asn_org="Mizanur Rahman ta Maya Cyber World",
+        ),
+        GeoResult(ip="8.8.8.8", city="Zürich", asn=15169),
+    ]
+    decoded = decode_response(encode_response(results), [r.ip for r in results])
+    assert [r.dict() for r in decoded] == [r.dict() for r in results]
+
+
+def test_response_round_trip_all_none():
+    decoded = decode_response(encode_response([GeoResult(ip="10.0.0.1")]), ["10.0.0.1"])
+    assert decoded[0].dict() == GeoResult(ip="10.0.0.1").dict()
+
+
+def test_frame_round_trip():
+    framed = frame(b"payload")
+    assert frame_length(framed[:HEADER_SIZE]) == len(b"payload")
+    assert framed[HEADER_SIZE:] == b"payload"
+
+
+def test_response_count_mismatch():
+    payload = encode_response([GeoResult(ip="1.1.1.1")])
+    with pytest.raises(ProtocolError):
+        decode_response(payload, ["1.1.1.1", "8.8.8.8"])
+
+
+@pytest.mark.parametrize("ip", ["ünïcode", "1" * 256])
+def test_encode_request_rejects_bad_address(ip):
+    with pytest.raises(ProtocolError):
+        encode_request([ip])
+
+
+@pytest.mark.parametrize("payload", [b"", b"\x00", b"\x00\x01", b"\x00\x01\x07" + b"1.1", b"\x00\x00extra"])
+def test_decode_request_rejects_malformed(payload):
+    with pytest.raises(ProtocolError):
+        decode_request(payload)
+
+
+def test_decode_response_rejects_truncated():
+    payload = encode_response([GeoResult(ip="1.1.1.1", country_long="Australia")])
+    with pytest.raises(ProtocolError):
+        decode_response(payload[:-3], ["1.1.1.1"])
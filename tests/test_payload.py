@@ -0,0 +1,115 @@
+import json
+
+from app.geo import GeoResult
+from app.model.enum import DeviceType
+from app.schema import DeviceInfo
+from app.schema.payload import device_payload_json
+
+
+def make_device(**overrides):
+    values = dict(
+        type=DeviceType.DESKTOP,
+        os="Linux",
+        os_version="",
+        browser="Chrome",
+        browser_version="143.0.0",
+        device_family="Other",
+        is_touch=False,
+        user_agent="Mozilla/5.0 (X11; Linux x86_64)...",
+        client_hints={
+            "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
+            "sec-ch-ua-platform": '"Linux"',
+            "sec-ch-ua-mobile": "?0",
+        },
+    )
+    values.update(overrides)
+    return DeviceInfo(**values)
+
+
+def test_matches_readme_sample():
+    geo_result = GeoResult(
+        ip="223.25.253.142",
+        country_short="BD",
+        country_long="Bangladesh",
+        region="Rangpur",
+        city="Rangpur",
+        latitude=23.7018,
+        longitude=90.3742,
+        timezone="Asia/Dhaka (+06:00)",
+        asn=134968,
+        asn_org="Mizanur Rahman ta Maya Cyber World",
+    )
+
+    assert json.loads(device_payload_json(geo_result, make_device())) == {
+        "ip": "223.25.253.142",
+        "country_short": "BD",
+        "country_long": "Bangladesh",
+        "region": "Rangpur",
+        "city": "Rangpur",
+        "latitude": 23.7018,
+        "longitude": 90.3742,
+        "timezone": "Asia/Dhaka (+06:00)",
+        "asn": 134968,
+        "asn_org": "Mizanur Rahman ta Maya Cyber World",
+        "device": {
+            "type": "DESKTOP",
+            "os": "Linux",
+            "os_version": "",
+            "browser": "Chrome",
+            "browser_version": "143.0.0",
+            "device_family": "Other",
+            "is_touch": False,
+            "user_agent": "Mozilla/5.0 (X11; Linux x86_64)...",
+            "client_hints": {
+                "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
+                "sec-ch-ua-platform": '"Linux"',
+                "sec-ch-ua-mobile": "?0",
+            },
+        },
+    }
+
+
+def test_none_geo_fields_and_hint_values():
+    device = make_device(
+        os_version=None,
+        browser_version=None,
+        device_family=None,
+        is_touch=True,
+        user_agent=None,
+        client_hints={"sec-ch-ua": None, "sec-ch-ua-platform": None, "sec-ch-ua-mobile": "?1"},
+    )
+    payload = json.loads(device_payload_json(GeoResult(ip="10.0.0.1"), device))
+
+    assert payload["ip"] == "10.0.0.1"
+    for field in ("country_short", "country_long", "region", "city", "latitude",
+                  "longitude", "timezone", "asn", "asn_org"):
+        assert payload[field] is None
+    assert payload["device"]["os_version"] is None
+    assert payload["device"]["user_agent"] is None
+    assert payload["device"]["is_touch"] is True
+    assert payload["device"]["client_hints"] == {
+        "sec-ch-ua": None,
+        "sec-ch-ua-platform": None,
+        "sec-ch-ua-mobile": "?1",
+    }
+
+
+def test_missing_ip_and_client_hints():
+    payload = json.loads(device_payload_json(GeoResult(ip=None), make_device(client_hints=None)))
+    assert payload["ip"] is None
+    assert payload["device"]["client_hints"] is None
+
+
+def test_non_ascii_quotes_and_control_characters():
+    geo_result = GeoResult(ip="2001:db8::1", city="Zürich", region="Île-de-France", asn_org='Acme "Net" \\ Ltd')
+    device = make_device(
+        user_agent='Mozilla/5.0 "quoted" \\ back\tslash\n日本語',
+        client_hints={'we"ird': "välue"},
+    )
+    payload = json.loads(device_payload_json(geo_result, device))
+
+    assert payload["city"] == "Zürich"
+    assert payload["region"] == "Île-de-France"
+    assert payload["asn_org"] == 'Acme "Net" \\ Ltd'
+    assert payload["device"]["user_agent"] == 'Mozilla/5.0 "quoted" \\ back\tslash\n日本語'
+    assert payload["device"]["client_hints"] == {'we"ird': "välue"}